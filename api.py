@@ -4,24 +4,40 @@ Complete version with authentication, admin controls, and cost management
 """
 
 from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional
-from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from anthropic import AsyncAnthropic
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+from cachetools import TTLCache
 from datetime import datetime, timedelta
+from dataclasses import asdict
+from itertools import groupby
 import os
 import sys
 import sqlite3
 import json
+import re
+import orjson
 import hashlib
 import secrets
+import threading
+import queue
+import atexit
+import time
+import asyncio
 
 sys.path.insert(0, os.path.dirname(__file__))
 
-from linkedin_assistant import ContentAssistant, TopicSuggestion
+from linkedin_assistant import ContentAssistant, TopicSuggestion, MONITORING_SEARCH_QUERIES, STATUS_RANK_SQL, TOPIC_STATUSES
+from db_pool import ConnectionPool
 
-app = FastAPI(title="LinkedIn Content Assistant API - Multi-User with Admin")
+app = FastAPI(title="LinkedIn Content Assistant API - Multi-User with Admin", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -32,7 +48,76 @@ app.add_middleware(
 )
 
 scheduler = None
+# Built once at startup for the scheduled job; monitor_industry_news() keeps no per-user state
+shared_assistant = None
 db_path = "content_assistant_multiuser.db"
+pool = ConnectionPool(db_path)
+password_hasher = PasswordHasher()
+# Verified against when an email is unknown, so a failed login takes as long whether or not the account exists
+_DUMMY_PASSWORD_HASH = password_hasher.hash(secrets.token_urlsafe(16))
+
+# token -> (user dict, session expiry); short TTL so admin changes propagate quickly
+_session_cache = TTLCache(maxsize=4096, ttl=60)
+_session_cache_lock = threading.Lock()
+# (user_id, topic_id) -> topic row for brainstorming; those columns never change once a topic is saved
+_topic_cache = TTLCache(maxsize=1024, ttl=300)
+_topic_cache_lock = threading.Lock()
+# (user_id, topic_id, digest of normalised user input) -> Claude's draft; cleared for a user when their profile changes
+_brainstorm_cache = TTLCache(maxsize=1024, ttl=3600)
+_brainstorm_cache_lock = threading.Lock()
+
+# Usage/activity rows are queued and written in batches by a background thread
+_log_queue = queue.Queue()
+_log_thread = None
+LOG_BATCH_SIZE = 200
+
+# user_id -> (expiry, profile); profiles only change through PUT /profile
+_profile_cache = {}
+_profile_cache_lock = threading.RLock()
+PROFILE_CACHE_TTL = 300
+# Web-search requests in flight at once across all users' scheduled runs (each run makes one per query)
+MONITORING_MAX_CONCURRENT_SEARCHES = 8
+# A scheduled run makes one web-search call per query, each estimated like a manual /monitor call
+SCHEDULED_MONITORING_COST = 0.03 * len(MONITORING_SEARCH_QUERIES)
+_json_decoder = json.JSONDecoder()
+# An array that opens with an object (or is empty), as opposed to an aside like "[1]"
+_TOPIC_ARRAY_START = re.compile(r'\[\s*[{\]]')
+_VALID_STATUSES = frozenset(TOPIC_STATUSES)
+_INVALID_STATUS_DETAIL = f"Invalid status. Must be one of: {', '.join(TOPIC_STATUSES)}"
+_ts_cache = (None, None)  # (epoch second, formatted '%Y-%m-%dT%H:%M:%S' for it)
+
+# Shared SQL text, so each pooled connection's statement cache is reused across requests
+SQL_MONTHLY_USAGE = 'SELECT COUNT(*) FROM usage_log WHERE user_id = ? AND timestamp >= ?'
+SQL_INSERT_USAGE = 'INSERT INTO usage_log (user_id, action_type, timestamp, cost_estimate) VALUES (?, ?, ?, ?)'
+SQL_INSERT_ACTIVITY = 'INSERT INTO activity_log (user_id, action, details, timestamp) VALUES (?, ?, ?, ?)'
+# RETURNING yields no row when the (user_id, title) index ignores a duplicate, so only new topics get child rows
+SQL_INSERT_TOPIC = 'INSERT OR IGNORE INTO topics (user_id, title, description, relevance_score, sources, key_points, suggested_angle, created_at, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) RETURNING id'
+SQL_INSERT_TOPIC_SOURCE = 'INSERT INTO topic_sources (topic_id, position, is_object, url, title, date) VALUES (?, ?, ?, ?, ?, ?)'
+SQL_INSERT_TOPIC_KEY_POINT = 'INSERT INTO topic_key_points (topic_id, position, text) VALUES (?, ?, ?)'
+SQL_GET_PROFILE = 'SELECT focus_areas, target_audience, content_goals, tone, monitoring_frequency FROM user_profiles WHERE user_id = ?'
+# One row per source / key point (kind 0 / 1), topics without sources still appear once via the LEFT JOIN
+SQL_GET_DIGEST = '''SELECT t.id, t.title, t.description, t.relevance_score, t.suggested_angle, t.created_at, t.status,
+        0 AS kind, s.position, s.url AS value, s.is_object, s.title AS source_title, s.date AS source_date
+    FROM topics t LEFT JOIN topic_sources s ON s.topic_id = t.id
+    WHERE t.user_id = :user_id AND t.created_at > :cutoff AND t.status = 'new'
+    UNION ALL
+    SELECT t.id, t.title, t.description, t.relevance_score, t.suggested_angle, t.created_at, t.status,
+        1, k.position, k.text, NULL, NULL, NULL
+    FROM topics t JOIN topic_key_points k ON k.topic_id = t.id
+    WHERE t.user_id = :user_id AND t.created_at > :cutoff AND t.status = 'new'
+    ORDER BY relevance_score DESC, created_at DESC, id, kind, position'''
+SQL_GET_TOPIC = 'SELECT id, title, description, key_points, suggested_angle FROM topics WHERE id = ? AND user_id = ?'
+SQL_GET_ACTIVITY = 'SELECT a.timestamp, u.name, u.email, a.action, a.details FROM activity_log a JOIN users u ON a.user_id = u.id ORDER BY a.timestamp DESC LIMIT ?'
+SQL_GET_SESSION_USER = '''SELECT u.id, u.email, u.name, u.is_active, u.is_admin, u.monthly_limit, s.expires_at
+    FROM sessions s JOIN users u ON s.user_id = u.id WHERE s.token = ?'''
+
+# Hot queries that must never scan a whole table, with placeholder parameters for EXPLAIN
+HOT_QUERIES = (
+    ("monthly usage", SQL_MONTHLY_USAGE, (0, '')),
+    ("digest", SQL_GET_DIGEST, {"user_id": 0, "cutoff": ''}),
+    ("activity log", SQL_GET_ACTIVITY, (50,)),
+    ("session lookup", SQL_GET_SESSION_USER, ('',)),
+)
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -92,73 +177,162 @@ class AdminUserInfo(BaseModel):
     monitoring_frequency: str
 
 def init_multiuser_database():
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        email TEXT UNIQUE NOT NULL,
-        password_hash TEXT NOT NULL,
-        name TEXT NOT NULL,
-        created_at TEXT NOT NULL,
-        last_login TEXT,
-        is_active INTEGER DEFAULT 1,
-        is_admin INTEGER DEFAULT 0,
-        monthly_limit INTEGER DEFAULT 100)''')
-    c.execute('''CREATE TABLE IF NOT EXISTS user_profiles (
-        user_id INTEGER PRIMARY KEY,
-        focus_areas TEXT NOT NULL,
-        target_audience TEXT,
-        content_goals TEXT,
-        tone TEXT,
-        monitoring_frequency TEXT DEFAULT 'weekly',
-        FOREIGN KEY (user_id) REFERENCES users (id))''')
-    c.execute('''CREATE TABLE IF NOT EXISTS sessions (
-        token TEXT PRIMARY KEY,
-        user_id INTEGER NOT NULL,
-        created_at TEXT NOT NULL,
-        expires_at TEXT NOT NULL,
-        FOREIGN KEY (user_id) REFERENCES users (id))''')
-    c.execute('''CREATE TABLE IF NOT EXISTS topics (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        title TEXT NOT NULL,
-        description TEXT,
-        relevance_score INTEGER,
-        sources TEXT,
-        key_points TEXT,
-        suggested_angle TEXT,
-        created_at TEXT,
-        status TEXT DEFAULT 'new',
-        FOREIGN KEY (user_id) REFERENCES users (id))''')
-    c.execute('''CREATE TABLE IF NOT EXISTS posts (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        topic_id INTEGER,
-        content TEXT,
-        version INTEGER DEFAULT 1,
-        created_at TEXT,
-        status TEXT DEFAULT 'draft',
-        FOREIGN KEY (user_id) REFERENCES users (id),
-        FOREIGN KEY (topic_id) REFERENCES topics (id))''')
-    c.execute('''CREATE TABLE IF NOT EXISTS usage_log (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        action_type TEXT NOT NULL,
-        timestamp TEXT NOT NULL,
-        cost_estimate REAL DEFAULT 0.03,
-        FOREIGN KEY (user_id) REFERENCES users (id))''')
-    c.execute('''CREATE TABLE IF NOT EXISTS activity_log (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        action TEXT NOT NULL,
-        details TEXT,
-        timestamp TEXT NOT NULL,
-        FOREIGN KEY (user_id) REFERENCES users (id))''')
-    conn.commit()
-    conn.close()
+    with pool.writer() as conn:
+        # WAL is persisted in the database file, so it only needs setting once
+        conn.execute('PRAGMA journal_mode=WAL')
+        c = conn.cursor()
+        c.execute('''CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            name TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            last_login TEXT,
+            is_active INTEGER DEFAULT 1,
+            is_admin INTEGER DEFAULT 0,
+            monthly_limit INTEGER DEFAULT 100)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS user_profiles (
+            user_id INTEGER PRIMARY KEY,
+            focus_areas TEXT NOT NULL,
+            target_audience TEXT,
+            content_goals TEXT,
+            tone TEXT,
+            monitoring_frequency TEXT DEFAULT 'weekly',
+            FOREIGN KEY (user_id) REFERENCES users (id))''')
+        c.execute('''CREATE TABLE IF NOT EXISTS sessions (
+            token TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            created_at TEXT NOT NULL,
+            expires_at TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users (id))''')
+        c.execute('''CREATE TABLE IF NOT EXISTS topics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT,
+            relevance_score INTEGER,
+            sources TEXT,
+            key_points TEXT,
+            suggested_angle TEXT,
+            created_at TEXT,
+            status TEXT DEFAULT 'new',
+            FOREIGN KEY (user_id) REFERENCES users (id))''')
+        c.execute('''CREATE TABLE IF NOT EXISTS posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            topic_id INTEGER,
+            content TEXT,
+            version INTEGER DEFAULT 1,
+            created_at TEXT,
+            status TEXT DEFAULT 'draft',
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            FOREIGN KEY (topic_id) REFERENCES topics (id))''')
+        c.execute('''CREATE TABLE IF NOT EXISTS usage_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            action_type TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            cost_estimate REAL DEFAULT 0.03,
+            FOREIGN KEY (user_id) REFERENCES users (id))''')
+        c.execute('''CREATE TABLE IF NOT EXISTS activity_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            details TEXT,
+            timestamp TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users (id))''')
+        # sessions.token is the primary key, so token lookups are already indexed
+        c.execute('CREATE INDEX IF NOT EXISTS idx_usage_user_ts ON usage_log(user_id, timestamp)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_topics_user_status_created ON topics(user_id, status, created_at DESC, relevance_score DESC)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_activity_ts ON activity_log(timestamp DESC)')
+        # Collapse duplicates left by earlier runs into the first copy so the unique index can be built
+        c.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name = 'idx_topics_user_title'")
+        if not c.fetchone():
+            # The surviving copy takes the furthest-along status of its duplicates, and their posts follow it
+            c.execute(f'''UPDATE topics SET status = (
+                    SELECT t2.status FROM topics t2 WHERE t2.user_id = topics.user_id AND t2.title = topics.title
+                    ORDER BY {STATUS_RANK_SQL.format(column="t2.status")} DESC LIMIT 1)
+                WHERE id IN (SELECT MIN(id) FROM topics GROUP BY user_id, title HAVING COUNT(*) > 1)''')
+            c.execute('''UPDATE posts SET topic_id = (
+                    SELECT MIN(t2.id) FROM topics t1 JOIN topics t2 ON t2.user_id = t1.user_id AND t2.title = t1.title
+                    WHERE t1.id = posts.topic_id)
+                WHERE topic_id IN (SELECT id FROM topics)''')
+            c.execute('DELETE FROM topics WHERE id NOT IN (SELECT MIN(id) FROM topics GROUP BY user_id, title)')
+            c.execute('CREATE UNIQUE INDEX idx_topics_user_title ON topics(user_id, title)')
+        # Sources and key points are normalised into child tables; the JSON columns on topics are still written
+        # Tables from before is_object existed may also hold rows attached to the wrong topic, so rebuild them from the JSON
+        c.execute("SELECT 1 FROM pragma_table_info('topic_sources') WHERE name = 'is_object'")
+        if not c.fetchone():
+            c.execute('DROP TABLE IF EXISTS topic_sources')
+            c.execute('DROP TABLE IF EXISTS topic_key_points')
+        c.execute('''CREATE TABLE IF NOT EXISTS topic_sources (
+            topic_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            is_object INTEGER NOT NULL DEFAULT 0,
+            url TEXT NOT NULL,
+            title TEXT,
+            date TEXT,
+            PRIMARY KEY (topic_id, position),
+            FOREIGN KEY (topic_id) REFERENCES topics (id)) WITHOUT ROWID''')
+        c.execute('''CREATE TABLE IF NOT EXISTS topic_key_points (
+            topic_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            PRIMARY KEY (topic_id, position),
+            FOREIGN KEY (topic_id) REFERENCES topics (id)) WITHOUT ROWID''')
+        # Backfill child rows for topics stored before the tables existed
+        c.execute('''INSERT OR IGNORE INTO topic_sources (topic_id, position, is_object, url, title, date)
+            SELECT t.id, j.key, j.type = 'object',
+                COALESCE(CASE j.type WHEN 'object' THEN json_extract(j.value, '$.url') ELSE j.value END, ''),
+                CASE j.type WHEN 'object' THEN json_extract(j.value, '$.title') END,
+                CASE j.type WHEN 'object' THEN json_extract(j.value, '$.date') END
+            FROM topics t, json_each(t.sources) j
+            WHERE json_valid(t.sources) AND NOT EXISTS (SELECT 1 FROM topic_sources s WHERE s.topic_id = t.id)''')
+        c.execute('''INSERT OR IGNORE INTO topic_key_points (topic_id, position, text)
+            SELECT t.id, j.key, j.value
+            FROM topics t, json_each(t.key_points) j
+            WHERE json_valid(t.key_points) AND NOT EXISTS (SELECT 1 FROM topic_key_points k WHERE k.topic_id = t.id)''')
+        # Give the planner statistics so it picks the indexes above even on small databases
+        c.execute('ANALYZE')
+
+def analyze_database():
+    """Refresh planner statistics; scheduled weekly"""
+    with pool.writer() as conn:
+        conn.execute('ANALYZE')
+
+def check_query_plans():
+    """Warn if any step of a hot query scans a table without an index (e.g. after ANALYZE on skewed data)"""
+    with pool.acquire() as conn:
+        for name, sql, params in HOT_QUERIES:
+            steps = [row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+            # "SCAN t" / "SCAN TABLE t" reads every row; "SCAN t USING ... INDEX" walks an index in order
+            if any(step.startswith("SCAN ") and " USING " not in step for step in steps):
+                print(f"WARNING: {name} query scans a table without an index: {' | '.join(steps)}")
+
+def _iso_now() -> str:
+    """Same as datetime.now().isoformat(), reformatting the date/time part at most once per second"""
+    global _ts_cache
+    sec, us = divmod(time.time_ns() // 1000, 1_000_000)
+    cached_sec, prefix = _ts_cache
+    if cached_sec != sec:
+        prefix = datetime.fromtimestamp(sec).strftime('%Y-%m-%dT%H:%M:%S')
+        _ts_cache = (sec, prefix)
+    return f"{prefix}.{us:06d}"
 
 def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
+    return password_hasher.hash(password)
+
+def verify_password(password: str, password_hash: str) -> bool:
+    if not password_hash.startswith("$argon2"):
+        # Legacy unsalted SHA-256 hash, upgraded on the next successful login
+        return secrets.compare_digest(password_hash, hashlib.sha256(password.encode()).hexdigest())
+    try:
+        return password_hasher.verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+def password_needs_rehash(password_hash: str) -> bool:
+    return not password_hash.startswith("$argon2") or password_hasher.check_needs_rehash(password_hash)
 
 def generate_token() -> str:
     return secrets.token_urlsafe(32)
@@ -167,20 +341,32 @@ def get_user_from_token(authorization: Optional[str] = Header(None)) -> dict:
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Not authenticated")
     token = authorization.replace("Bearer ", "")
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute('''SELECT u.id, u.email, u.name, u.is_active, u.is_admin, u.monthly_limit, s.expires_at
-        FROM sessions s JOIN users u ON s.user_id = u.id WHERE s.token = ?''', (token,))
-    result = c.fetchone()
-    conn.close()
-    if not result:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    user_id, email, name, is_active, is_admin, monthly_limit, expires_at = result
-    if datetime.fromisoformat(expires_at) < datetime.now():
+    with _session_cache_lock:
+        cached = _session_cache.get(token)
+    if cached is None:
+        with pool.acquire() as conn:
+            c = conn.cursor()
+            c.execute(SQL_GET_SESSION_USER, (token,))
+            result = c.fetchone()
+        if not result:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        user_id, email, name, is_active, is_admin, monthly_limit, expires_at = result
+        user = {"id": user_id, "email": email, "name": name, "is_active": bool(is_active), "is_admin": bool(is_admin), "monthly_limit": monthly_limit}
+        cached = (user, datetime.fromisoformat(expires_at))
+        with _session_cache_lock:
+            _session_cache[token] = cached
+    user, expires_at = cached
+    if expires_at < datetime.now():
         raise HTTPException(status_code=401, detail="Token expired")
-    if not is_active:
+    if not user["is_active"]:
         raise HTTPException(status_code=403, detail="Account suspended. Contact administrator.")
-    return {"id": user_id, "email": email, "name": name, "is_active": bool(is_active), "is_admin": bool(is_admin), "monthly_limit": monthly_limit}
+    return user
+
+def invalidate_user_sessions(user_id: int):
+    """Drop cached session lookups for a user so account changes apply immediately"""
+    with _session_cache_lock:
+        for token in [t for t, (u, _) in _session_cache.items() if u["id"] == user_id]:
+            _session_cache.pop(token, None)
 
 def require_admin(user: dict = Depends(get_user_from_token)) -> dict:
     if not user["is_admin"]:
@@ -188,124 +374,245 @@ def require_admin(user: dict = Depends(get_user_from_token)) -> dict:
     return user
 
 def check_user_limit(user_id: int, monthly_limit: int):
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
     current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    c.execute('SELECT COUNT(*) FROM usage_log WHERE user_id = ? AND timestamp >= ?', (user_id, current_month_start.isoformat()))
-    count = c.fetchone()[0]
-    conn.close()
+    with pool.acquire() as conn:
+        c = conn.cursor()
+        c.execute(SQL_MONTHLY_USAGE, (user_id, current_month_start.isoformat()))
+        count = c.fetchone()[0]
     if count >= monthly_limit:
         raise HTTPException(status_code=429, detail=f"Monthly limit of {monthly_limit} operations reached. Contact administrator.")
 
 def log_usage(user_id: int, action_type: str, cost_estimate: float = 0.03):
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute('INSERT INTO usage_log (user_id, action_type, timestamp, cost_estimate) VALUES (?, ?, ?, ?)', (user_id, action_type, datetime.now().isoformat(), cost_estimate))
-    conn.commit()
-    conn.close()
+    _log_queue.put(("usage", (user_id, action_type, _iso_now(), cost_estimate)))
 
 def log_activity(user_id: int, action: str, details: str = None):
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute('INSERT INTO activity_log (user_id, action, details, timestamp) VALUES (?, ?, ?, ?)', (user_id, action, details, datetime.now().isoformat()))
-    conn.commit()
-    conn.close()
+    _log_queue.put(("activity", (user_id, action, details, _iso_now())))
+
+def _drain_log_queue(max_items: int, timeout: float) -> list:
+    try:
+        batch = [_log_queue.get(timeout=timeout)]
+    except queue.Empty:
+        return []
+    while len(batch) < max_items:
+        try:
+            batch.append(_log_queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+def _write_log_batch(batch: list):
+    usage_rows = [row for kind, row in batch if kind == "usage"]
+    activity_rows = [row for kind, row in batch if kind == "activity"]
+    with pool.writer() as conn:
+        conn.execute('BEGIN IMMEDIATE')
+        if usage_rows:
+            conn.executemany(SQL_INSERT_USAGE, usage_rows)
+        if activity_rows:
+            conn.executemany(SQL_INSERT_ACTIVITY, activity_rows)
+        conn.commit()
+
+def _log_writer_loop():
+    while True:
+        batch = _drain_log_queue(LOG_BATCH_SIZE, timeout=0.5)
+        if batch:
+            try:
+                _write_log_batch(batch)
+            except Exception as e:
+                print(f"ERROR writing log batch: {str(e)}")
+
+def flush_logs():
+    """Write out everything still queued; registered with atexit"""
+    while True:
+        batch = _drain_log_queue(LOG_BATCH_SIZE, timeout=0)
+        if not batch:
+            return
+        _write_log_batch(batch)
+
+def start_log_writer():
+    global _log_thread
+    if _log_thread is not None:
+        return
+    _log_thread = threading.Thread(target=_log_writer_loop, name="log-writer", daemon=True)
+    _log_thread.start()
+    atexit.register(flush_logs)
+
+def save_topics(user_id: int, topics: List[dict], usage_row: tuple = None) -> int:
+    """Insert topics (and optionally their usage_log row) in one transaction; returns how many were new"""
+    now = _iso_now()
+    rows = []
+    for topic in topics:
+        # Sources may be plain URL strings (old format) or source objects (new format)
+        sources = topic.get('sources') or []
+        key_points = topic.get('key_points') or []
+        rows.append(((user_id, topic.get('title', ''), topic.get('description', ''), topic.get('relevance_score', 5), orjson.dumps(sources).decode(), orjson.dumps(key_points).decode(), topic.get('suggested_angle', ''), topic.get('created_at') or now, topic.get('status') or 'new'), sources, key_points))
+    inserted = 0
+    source_rows = []
+    key_point_rows = []
+    with pool.writer() as conn:
+        conn.execute('BEGIN IMMEDIATE')
+        for row, sources, key_points in rows:
+            new = conn.execute(SQL_INSERT_TOPIC, row).fetchone()
+            if new is None:
+                continue
+            inserted += 1
+            topic_id = new[0]
+            for position, source in enumerate(sources):
+                if isinstance(source, dict):
+                    source_rows.append((topic_id, position, 1, source.get('url', ''), source.get('title'), source.get('date')))
+                else:
+                    source_rows.append((topic_id, position, 0, source, None, None))
+            key_point_rows.extend((topic_id, position, point) for position, point in enumerate(key_points))
+        conn.executemany(SQL_INSERT_TOPIC_SOURCE, source_rows)
+        conn.executemany(SQL_INSERT_TOPIC_KEY_POINT, key_point_rows)
+        if usage_row:
+            conn.execute(SQL_INSERT_USAGE, usage_row)
+        conn.commit()
+    return inserted
+
+def get_user_topic(topic_id: int, user_id: int):
+    key = (user_id, topic_id)
+    with _topic_cache_lock:
+        row = _topic_cache.get(key)
+    if row is not None:
+        return row
+    with pool.acquire() as conn:
+        c = conn.cursor()
+        c.execute(SQL_GET_TOPIC, (topic_id, user_id))
+        row = c.fetchone()
+    if row is not None:
+        with _topic_cache_lock:
+            _topic_cache[key] = row
+    return row
 
 def get_user_profile(user_id: int) -> dict:
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute('SELECT focus_areas, target_audience, content_goals, tone, monitoring_frequency FROM user_profiles WHERE user_id = ?', (user_id,))
-    result = c.fetchone()
-    conn.close()
+    with _profile_cache_lock:
+        cached = _profile_cache.get(user_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+    with pool.acquire() as conn:
+        c = conn.cursor()
+        c.execute(SQL_GET_PROFILE, (user_id,))
+        result = c.fetchone()
     if not result:
         return None
-    return {"focus_areas": json.loads(result[0]), "target_audience": result[1], "content_goals": json.loads(result[2]), "tone": result[3], "monitoring_frequency": result[4]}
+    profile = {"focus_areas": orjson.loads(result["focus_areas"]), "target_audience": result["target_audience"], "content_goals": orjson.loads(result["content_goals"]), "tone": result["tone"], "monitoring_frequency": result["monitoring_frequency"]}
+    with _profile_cache_lock:
+        _profile_cache[user_id] = (time.monotonic() + PROFILE_CACHE_TTL, profile)
+    return profile
 
 @app.on_event("startup")
 async def startup_event():
-    global scheduler
+    global scheduler, shared_assistant
     init_multiuser_database()
+    check_query_plans()
+    start_log_writer()
+    # Jobs run on the app's event loop; plain functions are handed to its default executor
+    scheduler = AsyncIOScheduler()
+    # Statistics maintenance doesn't need Claude, so it runs with or without an API key
+    scheduler.add_job(analyze_database, CronTrigger(day_of_week='sun', hour=3, minute=0, timezone='Europe/London'), id='weekly_analyze', name='Weekly ANALYZE', replace_existing=True)
+    scheduler.start()
+    print("✓ Background scheduler started")
+    app.state.anthropic = None
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
         print("WARNING: ANTHROPIC_API_KEY not set")
         return
     try:
-        from anthropic import Anthropic
-        client = Anthropic(api_key=api_key)
+        # One client per process so every Claude call reuses its HTTP connection pool
+        app.state.anthropic = AsyncAnthropic(api_key=api_key)
+        shared_assistant = ContentAssistant(api_key, db_path=":memory:", max_concurrent_searches=MONITORING_MAX_CONCURRENT_SEARCHES)
         print("✓ Claude API key validated")
-        scheduler = BackgroundScheduler()
         scheduler.add_job(run_all_user_monitoring, CronTrigger(hour=8, minute=0, timezone='Europe/London'), id='daily_monitoring', name='Daily monitoring for all users', replace_existing=True)
-        scheduler.start()
-        print("✓ Background scheduler started")
     except Exception as e:
         print(f"ERROR during startup: {str(e)}")
 
+@app.on_event("shutdown")
+def shutdown_event():
+    if scheduler is not None:
+        scheduler.shutdown(wait=False)
+    flush_logs()
+    pool.close()
+
 @app.post("/auth/signup")
-async def signup(user: UserCreate):
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
+def signup(user: UserCreate):
+    # Hash before taking the writer; argon2 is deliberately slow and would hold up every other write
+    password_hash = hash_password(user.password)
     try:
-        c.execute('SELECT COUNT(*) FROM users')
-        user_count = c.fetchone()[0]
-        is_first_user = user_count == 0
-        c.execute('INSERT INTO users (email, password_hash, name, created_at, is_admin) VALUES (?, ?, ?, ?, ?)', (user.email, hash_password(user.password), user.name, datetime.now().isoformat(), 1 if is_first_user else 0))
-        user_id = c.lastrowid
-        default_profile = {"focus_areas": ["UK venture capital landscape", "Scaling businesses from Series A to IPO", "European vs US IPO markets", "Deeptech startups globally"], "target_audience": "Founders and leaders of scaling businesses", "content_goals": ["Provide actionable insights", "Share data-driven analysis", "Highlight market trends"], "tone": "Professional but accessible, data-driven", "monitoring_frequency": "weekly"}
-        c.execute('INSERT INTO user_profiles (user_id, focus_areas, target_audience, content_goals, tone, monitoring_frequency) VALUES (?, ?, ?, ?, ?, ?)', (user_id, json.dumps(default_profile["focus_areas"]), default_profile["target_audience"], json.dumps(default_profile["content_goals"]), default_profile["tone"], default_profile["monitoring_frequency"]))
-        conn.commit()
-        token = generate_token()
-        expires_at = datetime.now() + timedelta(days=30)
-        c.execute('INSERT INTO sessions (token, user_id, created_at, expires_at) VALUES (?, ?, ?, ?)', (token, user_id, datetime.now().isoformat(), expires_at.isoformat()))
-        conn.commit()
-        log_activity(user_id, "signup", f"New user registered: {user.name}")
-        return {"token": token, "user": {"id": user_id, "email": user.email, "name": user.name, "is_admin": is_first_user}}
+        with pool.writer() as conn:
+            c = conn.cursor()
+            c.execute('SELECT COUNT(*) FROM users')
+            user_count = c.fetchone()[0]
+            is_first_user = user_count == 0
+            c.execute('INSERT INTO users (email, password_hash, name, created_at, is_admin) VALUES (?, ?, ?, ?, ?)', (user.email, password_hash, user.name, _iso_now(), 1 if is_first_user else 0))
+            user_id = c.lastrowid
+            default_profile = {"focus_areas": ["UK venture capital landscape", "Scaling businesses from Series A to IPO", "European vs US IPO markets", "Deeptech startups globally"], "target_audience": "Founders and leaders of scaling businesses", "content_goals": ["Provide actionable insights", "Share data-driven analysis", "Highlight market trends"], "tone": "Professional but accessible, data-driven", "monitoring_frequency": "weekly"}
+            c.execute('INSERT INTO user_profiles (user_id, focus_areas, target_audience, content_goals, tone, monitoring_frequency) VALUES (?, ?, ?, ?, ?, ?)', (user_id, orjson.dumps(default_profile["focus_areas"]).decode(), default_profile["target_audience"], orjson.dumps(default_profile["content_goals"]).decode(), default_profile["tone"], default_profile["monitoring_frequency"]))
+            token = generate_token()
+            expires_at = datetime.now() + timedelta(days=30)
+            c.execute('INSERT INTO sessions (token, user_id, created_at, expires_at) VALUES (?, ?, ?, ?)', (token, user_id, _iso_now(), expires_at.isoformat()))
     except sqlite3.IntegrityError:
         raise HTTPException(status_code=400, detail="Email already registered")
-    finally:
-        conn.close()
+    log_activity(user_id, "signup", f"New user registered: {user.name}")
+    return {"token": token, "user": {"id": user_id, "email": user.email, "name": user.name, "is_admin": is_first_user}}
 
 @app.post("/auth/login")
-async def login(credentials: UserLogin):
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute('SELECT id, name, password_hash, is_active, is_admin FROM users WHERE email = ?', (credentials.email,))
-    result = c.fetchone()
-    if not result or result[2] != hash_password(credentials.password):
+def login(credentials: UserLogin):
+    with pool.acquire() as conn:
+        c = conn.cursor()
+        c.execute('SELECT id, name, password_hash, is_active, is_admin FROM users WHERE email = ?', (credentials.email,))
+        result = c.fetchone()
+    # Password checks run outside the writer lock
+    if not result:
+        verify_password(credentials.password, _DUMMY_PASSWORD_HASH)
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    user_id, name, password_hash, is_active, is_admin = result
+    if not verify_password(credentials.password, password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    user_id, name, _, is_active, is_admin = result
     if not is_active:
         raise HTTPException(status_code=403, detail="Account suspended. Contact administrator.")
-    c.execute('UPDATE users SET last_login = ? WHERE id = ?', (datetime.now().isoformat(), user_id))
-    token = generate_token()
-    expires_at = datetime.now() + timedelta(days=30)
-    c.execute('INSERT INTO sessions (token, user_id, created_at, expires_at) VALUES (?, ?, ?, ?)', (token, user_id, datetime.now().isoformat(), expires_at.isoformat()))
-    conn.commit()
-    conn.close()
+    new_hash = hash_password(credentials.password) if password_needs_rehash(password_hash) else None
+    with pool.writer() as conn:
+        c = conn.cursor()
+        if new_hash:
+            # Only replace the hash we verified, in case the password changed meanwhile
+            c.execute('UPDATE users SET password_hash = ? WHERE id = ? AND password_hash = ?', (new_hash, user_id, password_hash))
+        c.execute('UPDATE users SET last_login = ? WHERE id = ?', (_iso_now(), user_id))
+        token = generate_token()
+        expires_at = datetime.now() + timedelta(days=30)
+        c.execute('INSERT INTO sessions (token, user_id, created_at, expires_at) VALUES (?, ?, ?, ?)', (token, user_id, _iso_now(), expires_at.isoformat()))
     log_activity(user_id, "login", "User logged in")
     return {"token": token, "user": {"id": user_id, "email": credentials.email, "name": name, "is_admin": bool(is_admin)}}
 
+@app.post("/auth/logout")
+def logout(authorization: Optional[str] = Header(None), user: dict = Depends(get_user_from_token)):
+    token = authorization.replace("Bearer ", "")
+    with pool.writer() as conn:
+        conn.execute('DELETE FROM sessions WHERE token = ?', (token,))
+    with _session_cache_lock:
+        _session_cache.pop(token, None)
+    log_activity(user["id"], "logout", "User logged out")
+    return {"message": "Logged out successfully"}
+
 @app.get("/profile")
-async def get_profile(user: dict = Depends(get_user_from_token)):
+def get_profile(user: dict = Depends(get_user_from_token)):
     profile = get_user_profile(user["id"])
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
     return profile
 
 @app.put("/profile")
-async def update_profile(settings: UserSettings, user: dict = Depends(get_user_from_token)):
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
+def update_profile(settings: UserSettings, user: dict = Depends(get_user_from_token)):
     updates = []
     values = []
     if settings.focus_areas is not None:
         updates.append("focus_areas = ?")
-        values.append(json.dumps(settings.focus_areas))
+        values.append(orjson.dumps(settings.focus_areas).decode())
     if settings.target_audience is not None:
         updates.append("target_audience = ?")
         values.append(settings.target_audience)
     if settings.content_goals is not None:
         updates.append("content_goals = ?")
-        values.append(json.dumps(settings.content_goals))
+        values.append(orjson.dumps(settings.content_goals).decode())
     if settings.tone is not None:
         updates.append("tone = ?")
         values.append(settings.tone)
@@ -317,41 +624,78 @@ async def update_profile(settings: UserSettings, user: dict = Depends(get_user_f
     if updates:
         values.append(user["id"])
         query = f"UPDATE user_profiles SET {', '.join(updates)} WHERE user_id = ?"
-        c.execute(query, values)
-        conn.commit()
-    conn.close()
+        with pool.writer() as conn:
+            conn.execute(query, values)
+        with _profile_cache_lock:
+            _profile_cache.pop(user["id"], None)
+        # Cached drafts were written for the old profile
+        with _brainstorm_cache_lock:
+            for key in [key for key in _brainstorm_cache if key[0] == user["id"]]:
+                _brainstorm_cache.pop(key, None)
     log_activity(user["id"], "update_profile", "User updated their profile settings")
     return {"message": "Profile updated successfully"}
 
 @app.get("/digest", response_model=List[TopicResponse])
-async def get_digest(days: int = 7, user: dict = Depends(get_user_from_token)):
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
+def get_digest(days: int = 7, user: dict = Depends(get_user_from_token)):
     cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
-    c.execute("SELECT * FROM topics WHERE user_id = ? AND created_at > ? AND status = 'new' ORDER BY relevance_score DESC, created_at DESC", (user["id"], cutoff_date))
-    rows = c.fetchall()
-    conn.close()
+    with pool.acquire() as conn:
+        c = conn.cursor()
+        c.execute(SQL_GET_DIGEST, {"user_id": user["id"], "cutoff": cutoff_date})
+        rows = c.fetchall()
     suggestions = []
-    for row in rows:
-        suggestions.append(TopicResponse(id=row[0], title=row[2], description=row[3], relevance_score=row[4], sources=json.loads(row[5]) if row[5] else [], key_points=json.loads(row[6]) if row[6] else [], suggested_angle=row[7], created_at=row[8], status=row[9]))
+    for _, group in groupby(rows, key=lambda row: row["id"]):
+        group = list(group)
+        sources = []
+        key_points = []
+        for row in group:
+            if row["kind"] == 1:
+                key_points.append(row["value"])
+            elif row["value"] is None:
+                continue  # topic with no sources
+            elif not row["is_object"]:
+                sources.append(row["value"])
+            else:
+                sources.append(SourceInfo.model_construct(url=row["value"], title=row["source_title"], date=row["source_date"]))
+        topic = group[0]
+        # Rows come from our own database, so skip per-row validation
+        suggestions.append(TopicResponse.model_construct(id=topic["id"], title=topic["title"], description=topic["description"], relevance_score=topic["relevance_score"], sources=sources, key_points=key_points, suggested_angle=topic["suggested_angle"], created_at=topic["created_at"], status=topic["status"]))
     return suggestions
 
+def _extract_topic_array(text: str) -> Optional[List[dict]]:
+    """The JSON array of topic objects in text, or None if the first array of objects doesn't decode
+
+    Bracketed asides such as citation markers ("[1]") are skipped, but nothing past the first
+    array of objects is tried, so a truncated reply is never read from a nested "sources" list:
+
+    >>> _extract_topic_array('See [1]. [{"title": "T", "relevance_score": 8}] Done.')
+    [{'title': 'T', 'relevance_score': 8}]
+    >>> _extract_topic_array('[{"title": "T", "sources": [{"url": "https://a", "title": "A"}], "key_po') is None
+    True
+    """
+    match = _TOPIC_ARRAY_START.search(text)
+    if not match:
+        return None
+    try:
+        # raw_decode stops at the end of the array, so trailing prose is never scanned
+        data, _ = _json_decoder.raw_decode(text, match.start())
+    except json.JSONDecodeError:
+        return None
+    if isinstance(data, list) and all(isinstance(item, dict) for item in data):
+        return data
+    return None
+
 @app.post("/monitor")
 async def manual_monitoring(user: dict = Depends(get_user_from_token)):
-    check_user_limit(user["id"], user["monthly_limit"])
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
+    await run_in_threadpool(check_user_limit, user["id"], user["monthly_limit"])
+    client = app.state.anthropic
+    if client is None:
         raise HTTPException(status_code=503, detail="API key not configured")
     
     try:
-        profile = get_user_profile(user["id"])
+        profile = await run_in_threadpool(get_user_profile, user["id"])
         if not profile:
             raise HTTPException(status_code=404, detail="Profile not found")
         
-        # Call Claude directly instead of using ContentAssistant
-        from anthropic import Anthropic
-        client = Anthropic(api_key=api_key)
-        
         search_queries = [
             "UK venture capital funding news",
             "European tech IPO 2025",
@@ -397,7 +741,7 @@ Return ONLY a JSON array (no other text) with this exact structure:
 Make sure every key point references its source publication.
 """
         
-        message = client.messages.create(
+        message = await client.messages.create(
             model="claude-sonnet-4-20250514",
             max_tokens=4000,
             tools=[{"type": "web_search_20250305", "name": "web_search"}],
@@ -405,57 +749,23 @@ Make sure every key point references its source publication.
         )
         
         # Extract text from response
-        full_text = ""
-        for block in message.content:
-            if block.type == "text":
-                full_text += block.text
+        full_text = "".join(block.text for block in message.content if block.type == "text")
         
         # Parse JSON
-        suggestions = []
-        try:
-            start = full_text.find('[')
-            end = full_text.rfind(']') + 1
-            if start != -1 and end > start:
-                json_str = full_text[start:end]
-                data = json.loads(json_str)
-                
-                # Save directly to multi-user database
-                conn = sqlite3.connect(db_path)
-                c = conn.cursor()
-                
-                for item in data:
-                    # Handle both old format (list of strings) and new format (list of objects)
-                    sources = item.get('sources', [])
-                    sources_json = json.dumps(sources)
-                    
-                    c.execute('''
-                        INSERT INTO topics (user_id, title, description, relevance_score,
-                                          sources, key_points, suggested_angle, created_at, status)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        user["id"],
-                        item.get('title', ''),
-                        item.get('description', ''),
-                        item.get('relevance_score', 5),
-                        sources_json,
-                        json.dumps(item.get('key_points', [])),
-                        item.get('suggested_angle', ''),
-                        datetime.now().isoformat(),
-                        'new'
-                    ))
-                    suggestions.append(item)
-                
-                conn.commit()
-                conn.close()
-        except json.JSONDecodeError:
+        topics_found = 0
+        data = _extract_topic_array(full_text)
+        if data is None:
             print("Could not parse JSON from response")
+        elif data:
+            # Save directly to multi-user database in one transaction
+            topics_found = await run_in_threadpool(save_topics, user["id"], data)
         
         log_usage(user["id"], "manual_monitoring")
-        log_activity(user["id"], "manual_monitoring", f"Found {len(suggestions)} topics")
+        log_activity(user["id"], "manual_monitoring", f"Found {topics_found} topics")
         
         return {
             "message": "Monitoring completed",
-            "topics_found": len(suggestions),
+            "topics_found": topics_found,
             "timestamp": datetime.now().isoformat()
         }
         
@@ -465,38 +775,24 @@ Make sure every key point references its source publication.
         print(f"ERROR in monitoring: {error_details}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/brainstorm", response_model=BrainstormResponse)
-async def brainstorm(request: BrainstormRequest, user: dict = Depends(get_user_from_token)):
-    check_user_limit(user["id"], user["monthly_limit"])
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
-        raise HTTPException(status_code=503, detail="API key not configured")
-    try:
-        profile = get_user_profile(user["id"])
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
-        c.execute('SELECT * FROM topics WHERE id = ? AND user_id = ?', (request.topic_id, user["id"]))
-        row = c.fetchone()
-        conn.close()
-        if not row:
-            raise HTTPException(status_code=404, detail="Topic not found")
-        brainstorm_prompt = f"""You are a LinkedIn content strategist helping create a post.
+def build_brainstorm_prompt(row, profile: dict, user_input: str) -> str:
+    return f"""You are a LinkedIn content strategist helping create a post.
 
-TOPIC: {row[2]}
+TOPIC: {row["title"]}
 
-CONTEXT: {row[3]}
+CONTEXT: {row["description"]}
 
 KEY POINTS:
-{chr(10).join('- ' + point for point in json.loads(row[6]))}
+{chr(10).join('- ' + point for point in orjson.loads(row["key_points"]))}
 
-SUGGESTED ANGLE: {row[7]}
+SUGGESTED ANGLE: {row["suggested_angle"]}
 
 USER PROFILE:
 - Focus: {', '.join(profile['focus_areas'][:3])}
 - Audience: {profile['target_audience']}
 - Tone: {profile['tone']}
 
-USER INPUT: {request.user_input if request.user_input else "Help me draft a compelling LinkedIn post on this topic"}
+USER INPUT: {user_input if user_input else "Help me draft a compelling LinkedIn post on this topic"}
 
 Please help draft a LinkedIn post that:
 1. Hooks the reader in the first line
@@ -505,49 +801,106 @@ Please help draft a LinkedIn post that:
 4. Maintains the specified tone
 5. Is ~150-250 words (optimal LinkedIn length)
 6. Ends with a thought-provoking question or call-to-action"""
-        from anthropic import Anthropic
-        client = Anthropic(api_key=api_key)
-        message = client.messages.create(model="claude-sonnet-4-20250514", max_tokens=2000, messages=[{"role": "user", "content": brainstorm_prompt}])
+
+def _brainstorm_cache_key(user_id: int, topic_id: int, user_input: str) -> tuple:
+    """Requests differing only in case or whitespace share a cached draft"""
+    normalized_input = " ".join(user_input.lower().split())
+    return (user_id, topic_id, hashlib.blake2b(normalized_input.encode()).hexdigest())
+
+@app.post("/brainstorm", response_model=BrainstormResponse)
+async def brainstorm(request: BrainstormRequest, user: dict = Depends(get_user_from_token)):
+    await run_in_threadpool(check_user_limit, user["id"], user["monthly_limit"])
+    client = app.state.anthropic
+    if client is None:
+        raise HTTPException(status_code=503, detail="API key not configured")
+    try:
+        profile = await run_in_threadpool(get_user_profile, user["id"])
+        row = await run_in_threadpool(get_user_topic, request.topic_id, user["id"])
+        if not row:
+            raise HTTPException(status_code=404, detail="Topic not found")
+        cache_key = _brainstorm_cache_key(user["id"], request.topic_id, request.user_input)
+        with _brainstorm_cache_lock:
+            response = _brainstorm_cache.get(cache_key)
+        if response is not None:
+            # No Claude call was made, so nothing is charged
+            log_activity(user["id"], "brainstorm", f"Topic: {row['title']} (cached)")
+            return BrainstormResponse(response=response, topic_id=request.topic_id)
+        brainstorm_prompt = build_brainstorm_prompt(row, profile, request.user_input)
+        message = await client.messages.create(model="claude-sonnet-4-20250514", max_tokens=2000, messages=[{"role": "user", "content": brainstorm_prompt}])
         response = message.content[0].text
+        with _brainstorm_cache_lock:
+            _brainstorm_cache[cache_key] = response
         log_usage(user["id"], "brainstorm", 0.02)
-        log_activity(user["id"], "brainstorm", f"Topic: {row[2]}")
+        log_activity(user["id"], "brainstorm", f"Topic: {row['title']}")
         return BrainstormResponse(response=response, topic_id=request.topic_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _sse(data: str, event: str = None) -> str:
+    """Format one server-sent event; multi-line data is split across data: fields"""
+    lines = [f"event: {event}"] if event else []
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return "\n".join(lines) + "\n\n"
+
+@app.post("/brainstorm/stream")
+async def brainstorm_stream(request: BrainstormRequest, user: dict = Depends(get_user_from_token)):
+    await run_in_threadpool(check_user_limit, user["id"], user["monthly_limit"])
+    client = app.state.anthropic
+    if client is None:
+        raise HTTPException(status_code=503, detail="API key not configured")
+    profile = await run_in_threadpool(get_user_profile, user["id"])
+    row = await run_in_threadpool(get_user_topic, request.topic_id, user["id"])
+    if not row:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    brainstorm_prompt = build_brainstorm_prompt(row, profile, request.user_input)
+
+    async def events():
+        requested = False
+        try:
+            async with client.messages.stream(model="claude-sonnet-4-20250514", max_tokens=2000, messages=[{"role": "user", "content": brainstorm_prompt}]) as stream:
+                requested = True
+                async for text in stream.text_stream:
+                    yield _sse(text)
+            yield _sse("", event="done")
+        except Exception as e:
+            # Headers are already sent, so errors are reported in-band
+            yield _sse(str(e), event="error")
+        finally:
+            # Charge for any request Claude received, including when the client disconnects mid-stream
+            if requested:
+                log_usage(user["id"], "brainstorm", 0.02)
+                log_activity(user["id"], "brainstorm", f"Topic: {row['title']}")
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 @app.put("/topics/{topic_id}/status")
-async def update_topic_status(topic_id: int, status: str, user: dict = Depends(get_user_from_token)):
-    valid_statuses = ['new', 'reviewed', 'drafted', 'published', 'archived']
-    if status not in valid_statuses:
-        raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}")
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute('UPDATE topics SET status = ? WHERE id = ? AND user_id = ?', (status, topic_id, user["id"]))
-    conn.commit()
-    conn.close()
+def update_topic_status(topic_id: int, status: str, user: dict = Depends(get_user_from_token)):
+    if status not in _VALID_STATUSES:
+        raise HTTPException(status_code=400, detail=_INVALID_STATUS_DETAIL)
+    with pool.writer() as conn:
+        conn.execute('UPDATE topics SET status = ? WHERE id = ? AND user_id = ?', (status, topic_id, user["id"]))
     return {"message": "Status updated", "topic_id": topic_id, "status": status}
 
 @app.get("/admin/users", response_model=List[AdminUserInfo])
-async def get_all_users(admin: dict = Depends(require_admin)):
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
+def get_all_users(admin: dict = Depends(require_admin)):
     current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0)
-    c.execute('SELECT u.id, u.email, u.name, u.created_at, u.last_login, u.is_active, u.is_admin, u.monthly_limit, up.monitoring_frequency FROM users u LEFT JOIN user_profiles up ON u.id = up.user_id ORDER BY u.created_at DESC')
+    with pool.acquire() as conn:
+        c = conn.cursor()
+        c.execute('''SELECT u.id, u.email, u.name, u.created_at, u.last_login, u.is_active, u.is_admin, u.monthly_limit, up.monitoring_frequency, COALESCE(ul.cnt, 0) AS current_month_usage
+            FROM users u
+            LEFT JOIN user_profiles up ON u.id = up.user_id
+            LEFT JOIN (SELECT user_id, COUNT(*) AS cnt FROM usage_log WHERE timestamp >= ? GROUP BY user_id) ul ON ul.user_id = u.id
+            ORDER BY u.created_at DESC''', (current_month_start.isoformat(),))
+        rows = c.fetchall()
     users = []
-    for row in c.fetchall():
-        user_id = row[0]
-        c.execute('SELECT COUNT(*) FROM usage_log WHERE user_id = ? AND timestamp >= ?', (user_id, current_month_start.isoformat()))
-        usage_count = c.fetchone()[0]
-        users.append(AdminUserInfo(id=row[0], email=row[1], name=row[2], created_at=row[3], last_login=row[4], is_active=bool(row[5]), is_admin=bool(row[6]), monthly_limit=row[7], current_month_usage=usage_count, monitoring_frequency=row[8] or 'weekly'))
-    conn.close()
+    for row in rows:
+        users.append(AdminUserInfo(id=row["id"], email=row["email"], name=row["name"], created_at=row["created_at"], last_login=row["last_login"], is_active=bool(row["is_active"]), is_admin=bool(row["is_admin"]), monthly_limit=row["monthly_limit"], current_month_usage=row["current_month_usage"], monitoring_frequency=row["monitoring_frequency"] or 'weekly'))
     return users
 
 @app.put("/admin/users/{user_id}")
-async def update_user_admin(user_id: int, updates: AdminUserUpdate, admin: dict = Depends(require_admin)):
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
+def update_user_admin(user_id: int, updates: AdminUserUpdate, admin: dict = Depends(require_admin)):
     update_fields = []
     values = []
     if updates.is_active is not None:
@@ -562,82 +915,85 @@ async def update_user_admin(user_id: int, updates: AdminUserUpdate, admin: dict
     if update_fields:
         values.append(user_id)
         query = f"UPDATE users SET {', '.join(update_fields)} WHERE id = ?"
-        c.execute(query, values)
-        conn.commit()
-    conn.close()
+        with pool.writer() as conn:
+            conn.execute(query, values)
+        invalidate_user_sessions(user_id)
     log_activity(admin["id"], "admin_update_user", f"Updated user {user_id}: {updates.dict(exclude_none=True)}")
     return {"message": "User updated successfully"}
 
 @app.get("/admin/activity")
-async def get_activity_log(limit: int = 100, admin: dict = Depends(require_admin)):
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute('SELECT a.timestamp, u.name, u.email, a.action, a.details FROM activity_log a JOIN users u ON a.user_id = u.id ORDER BY a.timestamp DESC LIMIT ?', (limit,))
+def get_activity_log(limit: int = 100, admin: dict = Depends(require_admin)):
+    with pool.acquire() as conn:
+        c = conn.cursor()
+        c.execute(SQL_GET_ACTIVITY, (limit,))
+        rows = c.fetchall()
     activities = []
-    for row in c.fetchall():
-        activities.append({"timestamp": row[0], "user_name": row[1], "user_email": row[2], "action": row[3], "details": row[4]})
-    conn.close()
+    for row in rows:
+        activities.append({"timestamp": row["timestamp"], "user_name": row["name"], "user_email": row["email"], "action": row["action"], "details": row["details"]})
     return activities
 
 @app.get("/admin/usage-stats")
-async def get_usage_stats(admin: dict = Depends(require_admin)):
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
+def get_usage_stats(admin: dict = Depends(require_admin)):
     current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0)
-    c.execute('SELECT COUNT(*) FROM users')
-    total_users = c.fetchone()[0]
-    c.execute('SELECT COUNT(*) FROM users WHERE last_login >= ?', (current_month_start.isoformat(),))
-    active_users = c.fetchone()[0]
-    c.execute('SELECT COUNT(*), SUM(cost_estimate) FROM usage_log WHERE timestamp >= ?', (current_month_start.isoformat(),))
-    api_calls, total_cost = c.fetchone()
-    c.execute('SELECT action_type, COUNT(*), SUM(cost_estimate) FROM usage_log WHERE timestamp >= ? GROUP BY action_type', (current_month_start.isoformat(),))
+    with pool.acquire() as conn:
+        c = conn.cursor()
+        c.execute('SELECT COUNT(*) FROM users')
+        total_users = c.fetchone()[0]
+        c.execute('SELECT COUNT(*) FROM users WHERE last_login >= ?', (current_month_start.isoformat(),))
+        active_users = c.fetchone()[0]
+        c.execute('SELECT COUNT(*), SUM(cost_estimate) FROM usage_log WHERE timestamp >= ?', (current_month_start.isoformat(),))
+        api_calls, total_cost = c.fetchone()
+        c.execute('SELECT action_type, COUNT(*), SUM(cost_estimate) FROM usage_log WHERE timestamp >= ? GROUP BY action_type', (current_month_start.isoformat(),))
+        usage_rows = c.fetchall()
     usage_by_type = {}
-    for row in c.fetchall():
+    for row in usage_rows:
         usage_by_type[row[0]] = {"count": row[1], "cost": row[2]}
-    conn.close()
     return {"total_users": total_users, "active_users_this_month": active_users, "api_calls_this_month": api_calls or 0, "estimated_cost_this_month": round(total_cost or 0, 2), "usage_by_type": usage_by_type}
 
-def run_all_user_monitoring():
-    print(f"[{datetime.now()}] Running scheduled monitoring...")
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
-        return
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
+def _get_due_users() -> List[int]:
+    """Active users whose monitoring frequency is due today and who are under their monthly limit"""
+    due_users = []
     today = datetime.now()
     day_of_week = today.weekday()
     current_month_start = today.replace(day=1, hour=0, minute=0, second=0)
-    c.execute('SELECT u.id, u.is_active, u.monthly_limit, up.focus_areas, up.target_audience, up.content_goals, up.tone, up.monitoring_frequency FROM users u JOIN user_profiles up ON u.id = up.user_id WHERE u.is_active = 1')
-    users = c.fetchall()
-    for user_row in users:
-        user_id, is_active, monthly_limit, focus_areas, target_audience, content_goals, tone, frequency = user_row
-        c.execute('SELECT COUNT(*) FROM usage_log WHERE user_id = ? AND timestamp >= ?', (user_id, current_month_start.isoformat()))
-        usage_count = c.fetchone()[0]
-        if usage_count >= monthly_limit:
-            print(f"  User {user_id}: Monthly limit reached ({usage_count}/{monthly_limit})")
-            continue
-        should_run = False
-        if frequency == 'daily':
-            should_run = True
-        elif frequency == 'weekly' and day_of_week == 0:
-            should_run = True
-        elif frequency == 'biweekly' and day_of_week == 0 and today.day <= 14:
-            should_run = True
-        if not should_run:
-            continue
-        try:
-            profile = {"focus_areas": json.loads(focus_areas), "target_audience": target_audience, "content_goals": json.loads(content_goals), "tone": tone}
-            temp_assistant = ContentAssistant(api_key, db_path=":memory:")
-            temp_assistant.user_profile = profile
-            suggestions = temp_assistant.monitor_industry_news()
-            for suggestion in suggestions:
-                c.execute('INSERT INTO topics (user_id, title, description, relevance_score, sources, key_points, suggested_angle, created_at, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', (user_id, suggestion.title, suggestion.description, suggestion.relevance_score, json.dumps(suggestion.sources), json.dumps(suggestion.key_points), suggestion.suggested_angle, suggestion.created_at, suggestion.status))
-            c.execute('INSERT INTO usage_log (user_id, action_type, timestamp, cost_estimate) VALUES (?, ?, ?, ?)', (user_id, "scheduled_monitoring", datetime.now().isoformat(), 0.03))
-            conn.commit()
-            print(f"  User {user_id}: Found {len(suggestions)} topics")
-        except Exception as e:
-            print(f"  Error for user {user_id}: {str(e)}")
-    conn.close()
+    with pool.acquire() as conn:
+        c = conn.cursor()
+        c.execute('SELECT u.id, u.monthly_limit, up.monitoring_frequency FROM users u JOIN user_profiles up ON u.id = up.user_id WHERE u.is_active = 1')
+        users = c.fetchall()
+        for user_row in users:
+            user_id, monthly_limit, frequency = user_row["id"], user_row["monthly_limit"], user_row["monitoring_frequency"]
+            c.execute(SQL_MONTHLY_USAGE, (user_id, current_month_start.isoformat()))
+            usage_count = c.fetchone()[0]
+            if usage_count >= monthly_limit:
+                print(f"  User {user_id}: Monthly limit reached ({usage_count}/{monthly_limit})")
+                continue
+            should_run = False
+            if frequency == 'daily':
+                should_run = True
+            elif frequency == 'weekly' and day_of_week == 0:
+                should_run = True
+            elif frequency == 'biweekly' and day_of_week == 0 and today.day <= 14:
+                should_run = True
+            if not should_run:
+                continue
+            due_users.append(user_id)
+    return due_users
+
+async def _monitor_user(user_id: int):
+    try:
+        suggestions = await shared_assistant.monitor_industry_news()
+        topics_found = await run_in_threadpool(save_topics, user_id, [asdict(s) for s in suggestions], (user_id, "scheduled_monitoring", _iso_now(), SCHEDULED_MONITORING_COST))
+        print(f"  User {user_id}: Found {topics_found} new topics ({len(suggestions)} suggested)")
+    except Exception as e:
+        print(f"  Error for user {user_id}: {str(e)}")
+
+async def run_all_user_monitoring():
+    print(f"[{datetime.now()}] Running scheduled monitoring...")
+    if shared_assistant is None:
+        return
+    due_users = await run_in_threadpool(_get_due_users)
+    # Claude calls run concurrently on the event loop; results are written back one at a time through the writer connection
+    await asyncio.gather(*(_monitor_user(user_id) for user_id in due_users))
 
 @app.get("/")
 async def root():
@@ -0,0 +1,131 @@
+"""
+SQLite connection pool for the multi-user backend
+Keeps connections (and their page caches) warm across requests
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# Settings that SQLite does not persist in the database file
+CONNECTION_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-64000',
+    'PRAGMA busy_timeout=30000',
+)
+
+class ConnectionPool:
+    """Bounded pool of read-only connections plus a single writer connection"""
+
+    def __init__(self, db_path: str, size: int = 8, idle_timeout: float = 300.0):
+        self.db_path = db_path
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._last_prune = time.monotonic()
+        self._writer_conn = None
+        self._write_lock = threading.Lock()
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        if read_only:
+            conn.execute('PRAGMA query_only=1')
+        return conn
+
+    def _get_reader(self) -> sqlite3.Connection:
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+                return conn
+            except queue.Empty:
+                pass
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    return self._connect(read_only=True)
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            # Pool exhausted; wait for a release, re-checking in case pruning freed a slot
+            try:
+                conn, _ = self._idle.get(timeout=1.0)
+                return conn
+            except queue.Empty:
+                continue
+
+    def _prune_idle(self):
+        """Close pooled connections that have not been used within idle_timeout"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_prune < self.idle_timeout:
+                return
+            self._last_prune = now
+        keep = []
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if now - last_used > self.idle_timeout:
+                conn.close()
+                with self._lock:
+                    self._created -= 1
+            else:
+                keep.append((conn, last_used))
+        # Re-queue oldest first so the most recently used stays on top
+        for item in reversed(keep):
+            self._idle.put(item)
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a read-only connection for the duration of the block"""
+        conn = self._get_reader()
+        try:
+            yield conn
+        finally:
+            self._idle.put((conn, time.monotonic()))
+            self._prune_idle()
+
+    @contextmanager
+    def writer(self):
+        """Hold the single writer connection; commits on success, rolls back on error"""
+        with self._write_lock:
+            if self._writer_conn is None:
+                self._writer_conn = self._connect()
+            conn = self._writer_conn
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+
+    def close(self):
+        """Close every pooled connection"""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+        with self._write_lock:
+            if self._writer_conn is not None:
+                # Let SQLite refresh planner statistics it judges stale; readers are query_only so this runs on the writer
+                self._writer_conn.execute('PRAGMA optimize')
+                self._writer_conn.close()
+                self._writer_conn = None
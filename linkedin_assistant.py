@@ -4,16 +4,72 @@ Core backend implementation with Claude API integration
 """
 
 import os
-import json
+import asyncio
+import hashlib
+import orjson
 import sqlite3
+import threading
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, AsyncIterator
 import anthropic
+from cachetools import TTLCache
 from dataclasses import dataclass, asdict
 from enum import Enum
 
 # Configuration
 CLAUDE_MODEL = "claude-sonnet-4-5-20250929"
+MONITORING_SEARCH_QUERIES = [
+    "UK venture capital funding news",
+    "European tech IPO 2025",
+    "deeptech startup funding",
+    "Series B Series C funding Europe",
+    "UK tech scaleup news",
+    "European vs US IPO comparison"
+]
+MONITORING_MAX_TOPICS = 5
+# Topic workflow states, in the order a topic moves through them
+TOPIC_STATUSES = ('new', 'reviewed', 'drafted', 'published', 'archived')
+# SQL expression ranking a status column by how far along the workflow it is
+STATUS_RANK_SQL = "CASE {column} " + " ".join(f"WHEN '{status}' THEN {rank}" for rank, status in enumerate(TOPIC_STATUSES)) + " ELSE -1 END"
+TOPIC_COLUMNS = "id, title, description, relevance_score, sources, key_points, suggested_angle, created_at, status"
+
+def _dumps(value) -> str:
+    """Serialise to the JSON text stored in TEXT columns"""
+    return orjson.dumps(value).decode()
+
+def _loads(text):
+    return orjson.loads(text)
+
+def _title_hash(title: str) -> bytes:
+    """Dedup key for a topic: titles differing only in case or surrounding whitespace match"""
+    return hashlib.blake2b(title.strip().lower().encode(), digest_size=16).digest()
+
+# Client tool the model calls with its findings, so they arrive as structured input instead of prose
+SUBMIT_TOPICS_TOOL = {
+    "name": "submit_topics",
+    "description": "Submit the stories found while monitoring. Call this once, after searching.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "topics": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "title": {"type": "string", "description": "Story headline"},
+                        "description": {"type": "string", "description": "2-3 sentence summary"},
+                        "relevance_score": {"type": "integer", "minimum": 1, "maximum": 10},
+                        "sources": {"type": "array", "items": {"type": "string"}},
+                        "key_points": {"type": "array", "items": {"type": "string"}},
+                        "suggested_angle": {"type": "string", "description": "How to position this for maximum value"}
+                    },
+                    "required": ["title", "description", "relevance_score", "sources", "key_points", "suggested_angle"]
+                }
+            }
+        },
+        "required": ["topics"]
+    }
+}
 
 @dataclass
 class TopicSuggestion:
@@ -25,7 +81,30 @@ class TopicSuggestion:
     key_points: List[str]
     suggested_angle: str
     created_at: str
-    status: str  # 'new', 'reviewed', 'drafted', 'published', 'archived'
+    status: str  # one of TOPIC_STATUSES
+
+class _LazyJSONField:
+    """Data descriptor that keeps a stored JSON string and decodes it on first read"""
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = obj.__dict__[self.name]
+        if isinstance(value, str):
+            value = _loads(value) if value else []
+            obj.__dict__[self.name] = value
+        return value
+    
+    def __set__(self, obj, value):
+        obj.__dict__[self.name] = value
+
+class _StoredTopicSuggestion(TopicSuggestion):
+    """Topic read from the database; sources/key_points stay raw JSON until accessed"""
+    sources = _LazyJSONField()
+    key_points = _LazyJSONField()
 
 @dataclass
 class Post:
@@ -39,9 +118,21 @@ class Post:
 class ContentAssistant:
     """Main class for LinkedIn content assistant"""
     
-    def __init__(self, api_key: str, db_path: str = "content_assistant.db"):
-        self.client = anthropic.Anthropic(api_key=api_key)
+    def __init__(self, api_key: str, db_path: str = "content_assistant.db", max_concurrent_searches: int = len(MONITORING_SEARCH_QUERIES)):
+        self.client = anthropic.AsyncAnthropic(api_key=api_key)
         self.db_path = db_path
+        # Caps web-search requests in flight across every monitoring run sharing this assistant
+        self._search_slots = asyncio.Semaphore(max_concurrent_searches)
+        # topic_id -> TopicSuggestion, so repeated brainstorming on a topic skips the database
+        self._topic_cache = TTLCache(maxsize=256, ttl=300)
+        # (topic_id, digest of normalised user input) -> Claude's draft
+        self._brainstorm_cache = TTLCache(maxsize=512, ttl=3600)
+        # One long-lived connection (autocommit) shared by every helper; the lock serialises access to it
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        for pragma in ('PRAGMA journal_mode=WAL', 'PRAGMA synchronous=NORMAL', 'PRAGMA temp_store=MEMORY', 'PRAGMA cache_size=-64000'):
+            self._conn.execute(pragma)
         self.init_database()
         
         # User profile - customize this
@@ -67,66 +158,25 @@ class ContentAssistant:
                 "Topics already extensively covered in past month"
             ]
         }
-    
-    def init_database(self):
-        """Initialize SQLite database"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS topics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                relevance_score INTEGER,
-                sources TEXT,
-                key_points TEXT,
-                suggested_angle TEXT,
-                created_at TEXT,
-                status TEXT DEFAULT 'new'
-            )
-        ''')
         
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS posts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                topic_id INTEGER,
-                content TEXT,
-                version INTEGER DEFAULT 1,
-                created_at TEXT,
-                status TEXT DEFAULT 'draft',
-                FOREIGN KEY (topic_id) REFERENCES topics (id)
-            )
-        ''')
-        
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS monitoring_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                run_date TEXT,
-                topics_found INTEGER,
-                search_queries TEXT,
-                notes TEXT
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        # Static prompt text is rendered once and sent as a cached prefix on every call
+        self._monitoring_prompt = self._render_monitoring_prompt()
     
-    def monitor_industry_news(self) -> List[TopicSuggestion]:
-        """
-        Daily monitoring job - searches for relevant news and generates topic suggestions
-        Uses Claude with web search tool
-        """
-        search_queries = [
-            "UK venture capital funding news",
-            "European tech IPO 2025",
-            "deeptech startup funding",
-            "Series B Series C funding Europe",
-            "UK tech scaleup news",
-            "European vs US IPO comparison"
-        ]
-        
-        monitoring_prompt = f"""You are monitoring industry news for a LinkedIn content creator focused on:
+    @property
+    def user_profile(self) -> Dict:
+        return self._user_profile
+    
+    @user_profile.setter
+    def user_profile(self, profile: Dict):
+        """Replace the profile and re-render the prompt text built from it"""
+        self._user_profile = profile
+        self._brainstorm_preamble = self._render_brainstorm_preamble()
+        # Drafts were written against the old profile
+        self._brainstorm_cache.clear()
+    
+    def _render_monitoring_prompt(self) -> str:
+        """Build the monitoring prompt shared by every search query"""
+        return """You are monitoring industry news for a LinkedIn content creator focused on:
 - UK venture capital
 - Scaling businesses (Series A to IPO)
 - European vs US IPO markets
@@ -136,7 +186,7 @@ Target audience: Founders and leaders of scaling businesses
 
 Your task:
 1. Search for recent news (past week) on these topics
-2. Identify 3-5 stories that would make compelling LinkedIn posts
+2. Identify 1-3 stories that would make compelling LinkedIn posts
 3. For each story, provide:
    - A catchy title
    - Why it's relevant to scaling business leaders
@@ -150,168 +200,350 @@ Focus on stories with:
 - Actionable takeaways
 - Comparative analysis opportunities
 
-Search queries to use: {', '.join(search_queries)}
-
-Return your findings as a JSON array with this structure:
-[
-  {{
-    "title": "Story headline",
-    "description": "2-3 sentence summary",
-    "relevance_score": 8,
-    "sources": ["url1", "url2"],
-    "key_points": ["point 1", "point 2", "point 3"],
-    "suggested_angle": "How to position this for maximum value"
-  }}
-]
+When you have finished searching, return your findings by calling the submit_topics tool.
 """
-        
-        # Make API call with web search enabled
-        message = self.client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=4000,
-            tools=[{
-                "type": "web_search_20250305",
-                "name": "web_search"
-            }],
-            messages=[{
-                "role": "user",
-                "content": monitoring_prompt
-            }]
+    
+    def _render_brainstorm_preamble(self) -> str:
+        """Build the topic-independent part of the brainstorming prompt"""
+        # Profiles from the multi-user API have no 'avoid' list
+        avoid = self.user_profile.get('avoid', [])
+        avoid_line = f"\n- Avoid: {', '.join(avoid)}" if avoid else ""
+        return f"""You are a LinkedIn content strategist helping create a post.
+
+USER PROFILE:
+- Focus: {', '.join(self.user_profile['focus_areas'])}
+- Audience: {self.user_profile['target_audience']}
+- Tone: {self.user_profile['tone']}
+- Goals: {', '.join(self.user_profile['content_goals'])}{avoid_line}
+
+Please help draft a LinkedIn post that:
+1. Hooks the reader in the first line
+2. Provides valuable insights backed by data
+3. Offers actionable takeaways
+4. Maintains a professional but engaging tone
+5. Is ~150-250 words (optimal LinkedIn length)
+6. Ends with a thought-provoking question or call-to-action
+
+Include your reasoning about the approach you're taking."""
+    
+    def init_database(self):
+        """Initialize SQLite database"""
+        with self._lock:
+            c = self._conn.cursor()
+            
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS topics (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL,
+                    description TEXT,
+                    relevance_score INTEGER,
+                    sources TEXT,
+                    key_points TEXT,
+                    suggested_angle TEXT,
+                    created_at TEXT,
+                    status TEXT DEFAULT 'new',
+                    title_hash BLOB
+                )
+            ''')
+            
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS posts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    topic_id INTEGER,
+                    content TEXT,
+                    version INTEGER DEFAULT 1,
+                    created_at TEXT,
+                    status TEXT DEFAULT 'draft',
+                    FOREIGN KEY (topic_id) REFERENCES topics (id)
+                )
+            ''')
+            
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS monitoring_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_date TEXT,
+                    topics_found INTEGER,
+                    search_queries TEXT,
+                    notes TEXT
+                )
+            ''')
+            
+            # Digest range scan and the per-save MAX(version) lookup
+            c.execute('CREATE INDEX IF NOT EXISTS idx_topics_status_created ON topics(status, created_at DESC, relevance_score DESC)')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_posts_topic_version ON posts(topic_id, version DESC)')
+            
+            if not c.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_topics_title_hash'").fetchone():
+                self._migrate_title_hash(c)
+    
+    def _migrate_title_hash(self, c: sqlite3.Cursor):
+        """Backfill title_hash on older databases, fold duplicate topics into the oldest, then make it unique"""
+        survivors = 'SELECT MIN(id) FROM topics GROUP BY title_hash HAVING COUNT(*) > 1'
+        c.execute('BEGIN IMMEDIATE')
+        try:
+            columns = [row["name"] for row in c.execute('PRAGMA table_info(topics)')]
+            if 'title_hash' not in columns:
+                c.execute('ALTER TABLE topics ADD COLUMN title_hash BLOB')
+            rows = c.execute('SELECT id, title FROM topics WHERE title_hash IS NULL').fetchall()
+            c.executemany('UPDATE topics SET title_hash = ? WHERE id = ?', [(_title_hash(row["title"]), row["id"]) for row in rows])
+            # The surviving copy takes the furthest-along status of its duplicates
+            c.execute(f'''
+                UPDATE topics SET status = (
+                    SELECT t2.status FROM topics t2 WHERE t2.title_hash = topics.title_hash
+                    ORDER BY {STATUS_RANK_SQL.format(column="t2.status")} DESC LIMIT 1
+                )
+                WHERE id IN ({survivors})
+            ''')
+            # Re-point drafts at the surviving topic before removing its duplicates
+            c.execute('''
+                UPDATE posts SET topic_id = (
+                    SELECT MIN(t2.id) FROM topics t1 JOIN topics t2 ON t2.title_hash = t1.title_hash
+                    WHERE t1.id = posts.topic_id
+                )
+                WHERE topic_id IN (SELECT id FROM topics)
+            ''')
+            # Merged topics now hold drafts from several copies; renumber them in creation order
+            c.execute(f'''
+                UPDATE posts SET version = (
+                    SELECT numbered.version FROM (
+                        SELECT id, ROW_NUMBER() OVER (PARTITION BY topic_id ORDER BY created_at, id) AS version
+                        FROM posts WHERE topic_id IN ({survivors})
+                    ) numbered WHERE numbered.id = posts.id
+                )
+                WHERE topic_id IN ({survivors})
+            ''')
+            c.execute('DELETE FROM topics WHERE id NOT IN (SELECT MIN(id) FROM topics GROUP BY title_hash)')
+            c.execute('CREATE UNIQUE INDEX idx_topics_title_hash ON topics(title_hash)')
+        except Exception:
+            c.execute('ROLLBACK')
+            raise
+        c.execute('COMMIT')
+    
+    async def monitor_industry_news(self) -> List[TopicSuggestion]:
+        """
+        Daily monitoring job - searches for relevant news and generates topic suggestions
+        Uses Claude with web search tool
+        """
+        # One request per query so the searches run concurrently rather than one after another
+        results = await asyncio.gather(
+            *(self._search_one(query) for query in MONITORING_SEARCH_QUERIES),
+            return_exceptions=True
         )
         
-        # Extract suggestions from response
-        suggestions = self._parse_monitoring_response(message)
+        failures = [result for result in results if isinstance(result, Exception)]
+        if len(failures) == len(results):
+            # Nothing to report; let the caller see the error rather than an empty run
+            raise failures[0]
+        
+        # Merge, keeping the highest-scoring copy of stories found by several queries
+        by_title = {}
+        for query, result in zip(MONITORING_SEARCH_QUERIES, results):
+            if isinstance(result, Exception):
+                print(f"Search failed for '{query}': {result}")
+                continue
+            for suggestion in result:
+                key = _title_hash(suggestion.title)
+                if key not in by_title or suggestion.relevance_score > by_title[key].relevance_score:
+                    by_title[key] = suggestion
+        suggestions = sorted(by_title.values(), key=lambda s: s.relevance_score, reverse=True)[:MONITORING_MAX_TOPICS]
         
         # Save to database
-        for suggestion in suggestions:
-            self._save_topic(suggestion)
+        self._save_topics_bulk(suggestions)
         
         # Log the monitoring run
-        self._log_monitoring_run(len(suggestions), search_queries)
+        self._log_monitoring_run(len(suggestions), MONITORING_SEARCH_QUERIES)
         
         return suggestions
     
+    async def _search_one(self, query: str) -> List[TopicSuggestion]:
+        """Run the monitoring prompt for a single search query"""
+        # Make API call with web search enabled
+        async with self._search_slots:
+            message = await self.client.messages.create(
+                model=CLAUDE_MODEL,
+                max_tokens=4000,
+                tools=[{
+                    "type": "web_search_20250305",
+                    "name": "web_search"
+                }, SUBMIT_TOPICS_TOOL],
+                messages=[{
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": self._monitoring_prompt,
+                            "cache_control": {"type": "ephemeral"}
+                        },
+                        {"type": "text", "text": f"Search query to use: {query}"}
+                    ]
+                }]
+            )
+        
+        # Extract suggestions from response
+        return self._parse_monitoring_response(message)
+    
     def _parse_monitoring_response(self, message) -> List[TopicSuggestion]:
         """Parse Claude's response and extract topic suggestions"""
-        suggestions = []
+        data = None
+        texts = []
         
-        # Extract text content from response
-        full_text = ""
+        # Prefer the structured submit_topics call, collecting text blocks on the same pass
         for block in message.content:
+            if block.type == "tool_use" and block.name == "submit_topics":
+                data = block.input.get("topics", [])
+                break
             if block.type == "text":
-                full_text += block.text
-        
-        # Try to extract JSON from the response
+                texts.append(block.text)
+        
+        if data is None:
+            # Fall back to a JSON array in the text; try each block alone before joining them
+            for text in texts:
+                data = self._extract_json_array(text)
+                if data is not None:
+                    break
+            else:
+                if len(texts) > 1:
+                    data = self._extract_json_array("".join(texts))
+                if data is None:
+                    print("Could not parse JSON from response")
+        
+        created_at = datetime.now().isoformat()
+        return [TopicSuggestion(
+            id=None,
+            title=item.get('title', ''),
+            description=item.get('description', ''),
+            relevance_score=item.get('relevance_score', 5),
+            sources=item.get('sources', []),
+            key_points=item.get('key_points', []),
+            suggested_angle=item.get('suggested_angle', ''),
+            created_at=created_at,
+            status='new'
+        ) for item in data or []]
+    
+    @staticmethod
+    def _extract_json_array(text: str) -> Optional[List[Dict]]:
+        """Decode the outermost [...] span of text as a list of topic objects, or None if there isn't one"""
+        start = text.find('[')
+        end = text.rfind(']') + 1
+        if start == -1 or end <= start:
+            return None
         try:
-            # Look for JSON array in the response
-            start = full_text.find('[')
-            end = full_text.rfind(']') + 1
-            if start != -1 and end > start:
-                json_str = full_text[start:end]
-                data = json.loads(json_str)
-                
-                for item in data:
-                    suggestion = TopicSuggestion(
-                        id=None,
-                        title=item.get('title', ''),
-                        description=item.get('description', ''),
-                        relevance_score=item.get('relevance_score', 5),
-                        sources=item.get('sources', []),
-                        key_points=item.get('key_points', []),
-                        suggested_angle=item.get('suggested_angle', ''),
-                        created_at=datetime.now().isoformat(),
-                        status='new'
-                    )
-                    suggestions.append(suggestion)
-        except json.JSONDecodeError:
-            print("Could not parse JSON from response")
-        
-        return suggestions
+            data = _loads(text[start:end])
+        except orjson.JSONDecodeError:
+            return None
+        if isinstance(data, list) and all(isinstance(item, dict) for item in data):
+            return data
+        return None
     
-    def _save_topic(self, topic: TopicSuggestion):
-        """Save topic suggestion to database"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        c.execute('''
-            INSERT INTO topics (title, description, relevance_score, sources, 
-                              key_points, suggested_angle, created_at, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+    def _save_topics_bulk(self, topics: List[TopicSuggestion]):
+        """Save topic suggestions to database in a single transaction; a title seen before refreshes that topic"""
+        rows = [(
             topic.title,
             topic.description,
             topic.relevance_score,
-            json.dumps(topic.sources),
-            json.dumps(topic.key_points),
+            _dumps(topic.sources),
+            _dumps(topic.key_points),
             topic.suggested_angle,
             topic.created_at,
-            topic.status
-        ))
-        
-        conn.commit()
-        conn.close()
+            topic.status,
+            _title_hash(topic.title)
+        ) for topic in topics]
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.executemany('''
+                    INSERT INTO topics (title, description, relevance_score, sources, 
+                                      key_points, suggested_angle, created_at, status, title_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(title_hash) DO UPDATE SET
+                        relevance_score = excluded.relevance_score,
+                        sources = excluded.sources,
+                        created_at = excluded.created_at
+                ''', rows)
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+            # Refreshed topics may be cached with their old score and sources
+            self._topic_cache.clear()
     
     def _log_monitoring_run(self, topics_found: int, queries: List[str]):
         """Log monitoring run to database"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        c.execute('''
-            INSERT INTO monitoring_log (run_date, topics_found, search_queries, notes)
-            VALUES (?, ?, ?, ?)
-        ''', (
-            datetime.now().isoformat(),
-            topics_found,
-            json.dumps(queries),
-            f"Found {topics_found} relevant topics"
-        ))
-        
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._conn.execute('''
+                INSERT INTO monitoring_log (run_date, topics_found, search_queries, notes)
+                VALUES (?, ?, ?, ?)
+            ''', (
+                datetime.now().isoformat(),
+                topics_found,
+                _dumps(queries),
+                f"Found {topics_found} relevant topics"
+            ))
     
     def get_weekly_digest(self, days: int = 7) -> List[TopicSuggestion]:
         """Get topic suggestions from the past week"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
         cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
         
-        c.execute('''
-            SELECT * FROM topics 
-            WHERE created_at > ? AND status = 'new'
-            ORDER BY relevance_score DESC, created_at DESC
-        ''', (cutoff_date,))
+        with self._lock:
+            rows = self._conn.execute(f'''
+                SELECT {TOPIC_COLUMNS} FROM topics 
+                WHERE created_at > ? AND status = 'new'
+                ORDER BY relevance_score DESC, created_at DESC
+            ''', (cutoff_date,)).fetchall()
         
-        rows = c.fetchall()
-        conn.close()
+        return [self._row_to_topic(row) for row in rows]
+    
+    async def brainstorm_post(self, topic_id: int, user_input: str = "") -> str:
+        """
+        Interactive brainstorming session for a specific topic
+        """
+        cache_key = self._brainstorm_cache_key(topic_id, user_input)
+        cached = self._brainstorm_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        suggestions = []
-        for row in rows:
-            suggestion = TopicSuggestion(
-                id=row[0],
-                title=row[1],
-                description=row[2],
-                relevance_score=row[3],
-                sources=json.loads(row[4]) if row[4] else [],
-                key_points=json.loads(row[5]) if row[5] else [],
-                suggested_angle=row[6],
-                created_at=row[7],
-                status=row[8]
-            )
-            suggestions.append(suggestion)
+        message = await self.client.messages.create(
+            model=CLAUDE_MODEL,
+            max_tokens=2000,
+            messages=self._brainstorm_messages(topic_id, user_input)
+        )
         
-        return suggestions
+        response = message.content[0].text
+        self._brainstorm_cache[cache_key] = response
+        return response
     
-    def brainstorm_post(self, topic_id: int, user_input: str = "") -> str:
+    async def brainstorm_post_stream(self, topic_id: int, user_input: str = "") -> AsyncIterator[str]:
         """
-        Interactive brainstorming session for a specific topic
+        Same as brainstorm_post, but yields the draft as Claude generates it
         """
+        cache_key = self._brainstorm_cache_key(topic_id, user_input)
+        cached = self._brainstorm_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        async with self.client.messages.stream(
+            model=CLAUDE_MODEL,
+            max_tokens=2000,
+            messages=self._brainstorm_messages(topic_id, user_input)
+        ) as stream:
+            async for text in stream.text_stream:
+                chunks.append(text)
+                yield text
+        
+        self._brainstorm_cache[cache_key] = "".join(chunks)
+    
+    def _brainstorm_cache_key(self, topic_id: int, user_input: str) -> tuple:
+        """Requests differing only in case or whitespace share a cached draft"""
+        normalized_input = " ".join(user_input.lower().split())
+        return (topic_id, hashlib.blake2b(normalized_input.encode()).hexdigest())
+    
+    def _brainstorm_messages(self, topic_id: int, user_input: str) -> List[Dict]:
+        """Build the brainstorming request: cached preamble followed by the topic"""
         # Get topic from database
         topic = self._get_topic(topic_id)
         
-        brainstorm_prompt = f"""You are a LinkedIn content strategist helping create a post.
-
-TOPIC: {topic.title}
+        topic_prompt = f"""TOPIC: {topic.title}
 
 CONTEXT:
 {topic.description}
@@ -322,91 +554,93 @@ KEY POINTS:
 SUGGESTED ANGLE:
 {topic.suggested_angle}
 
-USER PROFILE:
-- Focus: UK VC, scaling businesses, European IPO markets, deeptech
-- Audience: Founders and leaders of scaling businesses
-- Tone: {self.user_profile['tone']}
-- Goals: {', '.join(self.user_profile['content_goals'])}
-
-USER INPUT: {user_input if user_input else "Help me draft a compelling LinkedIn post on this topic"}
-
-Please help draft a LinkedIn post that:
-1. Hooks the reader in the first line
-2. Provides valuable insights backed by data
-3. Offers actionable takeaways
-4. Maintains a professional but engaging tone
-5. Is ~150-250 words (optimal LinkedIn length)
-6. Ends with a thought-provoking question or call-to-action
-
-Include your reasoning about the approach you're taking."""
-        
-        message = self.client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=2000,
-            messages=[{
-                "role": "user",
-                "content": brainstorm_prompt
-            }]
-        )
-        
-        response = message.content[0].text
-        return response
+USER INPUT: {user_input if user_input else "Help me draft a compelling LinkedIn post on this topic"}"""
+        
+        return [{
+            "role": "user",
+            "content": [
+                {
+                    "type": "text",
+                    "text": self._brainstorm_preamble,
+                    "cache_control": {"type": "ephemeral"}
+                },
+                {"type": "text", "text": topic_prompt}
+            ]
+        }]
     
     def _get_topic(self, topic_id: int) -> TopicSuggestion:
         """Retrieve topic from database"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        c.execute('SELECT * FROM topics WHERE id = ?', (topic_id,))
-        row = c.fetchone()
-        conn.close()
+        with self._lock:
+            topic = self._topic_cache.get(topic_id)
+            if topic is not None:
+                return topic
+            row = self._conn.execute(f'SELECT {TOPIC_COLUMNS} FROM topics WHERE id = ?', (topic_id,)).fetchone()
         
         if not row:
             raise ValueError(f"Topic {topic_id} not found")
         
-        return TopicSuggestion(
-            id=row[0],
-            title=row[1],
-            description=row[2],
-            relevance_score=row[3],
-            sources=json.loads(row[4]) if row[4] else [],
-            key_points=json.loads(row[5]) if row[5] else [],
-            suggested_angle=row[6],
-            created_at=row[7],
-            status=row[8]
+        topic = self._row_to_topic(row)
+        with self._lock:
+            self._topic_cache[topic_id] = topic
+        return topic
+    
+    @staticmethod
+    def _row_to_topic(row: sqlite3.Row) -> TopicSuggestion:
+        """Build a TopicSuggestion from a topics row selected with TOPIC_COLUMNS"""
+        return _StoredTopicSuggestion(
+            id=row["id"],
+            title=row["title"],
+            description=row["description"],
+            relevance_score=row["relevance_score"],
+            sources=row["sources"] or "",
+            key_points=row["key_points"] or "",
+            suggested_angle=row["suggested_angle"],
+            created_at=row["created_at"],
+            status=row["status"]
         )
     
     def save_post(self, topic_id: int, content: str, status: str = "draft") -> int:
         """Save a post draft"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        # Get current version number
-        c.execute('SELECT MAX(version) FROM posts WHERE topic_id = ?', (topic_id,))
-        result = c.fetchone()
-        version = (result[0] or 0) + 1
-        
-        c.execute('''
-            INSERT INTO posts (topic_id, content, version, created_at, status)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (topic_id, content, version, datetime.now().isoformat(), status))
-        
-        post_id = c.lastrowid
-        conn.commit()
-        conn.close()
+        with self._lock:
+            c = self._conn.cursor()
+            
+            # Get current version number
+            c.execute('SELECT MAX(version) FROM posts WHERE topic_id = ?', (topic_id,))
+            result = c.fetchone()
+            version = (result[0] or 0) + 1
+            
+            c.execute('''
+                INSERT INTO posts (topic_id, content, version, created_at, status)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (topic_id, content, version, datetime.now().isoformat(), status))
+            
+            post_id = c.lastrowid
         
         return post_id
+    
+    def update_topic_status(self, topic_id: int, status: str):
+        """Update a topic's status"""
+        with self._lock:
+            c = self._conn.execute('UPDATE topics SET status = ? WHERE id = ?', (status, topic_id))
+            self._topic_cache.pop(topic_id, None)
+            if c.rowcount == 0:
+                raise ValueError(f"Topic {topic_id} not found")
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
 
 
 # Example usage
-if __name__ == "__main__":
+async def main():
     # Initialize assistant
     api_key = os.getenv("ANTHROPIC_API_KEY")
     assistant = ContentAssistant(api_key)
     
     # Simulate daily monitoring (you'd run this on a schedule)
     print("Running daily news monitoring...")
-    suggestions = assistant.monitor_industry_news()
+    suggestions = await assistant.monitor_industry_news()
     print(f"Found {len(suggestions)} topic suggestions")
     
     # Get weekly digest
@@ -420,8 +654,13 @@ if __name__ == "__main__":
     if digest:
         print("\n" + "="*60)
         print("Brainstorming on top topic...")
-        response = assistant.brainstorm_post(
+        response = await assistant.brainstorm_post(
             digest[0].id,
             "I want to emphasize the data points and make it actionable for Series B founders"
         )
-        print(response)
\ No newline at end of file
+        print(response)
+
+
+if __name__ == "__main__":
+    # One event loop for the whole run; the client's connection pool is bound to the loop it first ran on
+    asyncio.run(main())